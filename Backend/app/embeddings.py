@@ -1,19 +1,31 @@
 # embeddings.py
 from transformers import AutoTokenizer, AutoModel
 import torch
+import torch.nn.functional as F
+
 
 class TransformersEmbedding:
     def __init__(self, model_name: str = "all-mini-lm-l6-v2"):
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model     = AutoModel.from_pretrained(model_name)
 
-    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+    def embed_documents(self, texts: list[str], batch_size: int = 64) -> list[list[float]]:
+        embeddings = []
+        for i in range(0, len(texts), batch_size):
+            embeddings.extend(self._embed_batch(texts[i:i + batch_size]))
+        return embeddings
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
         # Tokenize + forward
         encodings = self.tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
         with torch.no_grad():
             output = self.model(**encodings).last_hidden_state  # (batch, seq, dim)
-        # Mean-pool along the seq dimension
-        embeddings = output.mean(dim=1)
+        # Mean-pool along the seq dimension, ignoring padding so a text embeds
+        # the same regardless of what it was batched with
+        mask = encodings["attention_mask"].unsqueeze(-1).to(output.dtype)
+        embeddings = (output * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        # Unit-length vectors, so inner product equals cosine similarity
+        embeddings = F.normalize(embeddings, p=2, dim=1)
         return embeddings.cpu().tolist()
 
     def embed_query(self, text: str) -> list[float]:
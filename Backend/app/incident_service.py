@@ -1,5 +1,5 @@
 from .pipeline import IncidentAnalyzer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import logging
 import os
 
@@ -33,6 +33,16 @@ class IncidentService:
                 logger.error(f"Failed to add incident: {e}")
         return success_count
     
+    def add_incidents_bulk(self, incidents: List[Dict[str, Any]]) -> int:
+        """Add multiple incidents in batched vector store writes"""
+        valid = [incident for incident in incidents if incident.get('incident_id')]
+        if len(valid) < len(incidents):
+            logger.error(f"Skipped {len(incidents) - len(valid)} incidents without an ID")
+        
+        ingested = self.analyzer.ingest_incidents_bulk(valid)
+        logger.info(f"Bulk added {ingested} incidents")
+        return ingested
+    
     def analyze_root_cause(self, query: str, k: int = 5) -> str:
         """Analyze root cause"""
         return self.analyzer.analyze_root_cause(query, k)
@@ -41,6 +51,30 @@ class IncidentService:
         """Analyze patterns"""
         return self.analyzer.analyze_patterns(query, k)
     
+    async def aanalyze_root_cause(self, query: str, k: int = 5) -> str:
+        """Analyze root cause without blocking the event loop"""
+        return await self.analyzer.aanalyze_root_cause(query, k)
+    
+    async def aanalyze_patterns(self, query: str, k: int = 5) -> str:
+        """Analyze patterns without blocking the event loop"""
+        return await self.analyzer.aanalyze_patterns(query, k)
+    
+    def stream_root_cause(self, query: str, k: int = 5) -> Iterator[str]:
+        """Stream root cause analysis as it is generated"""
+        return self.analyzer.stream_root_cause(query, k)
+    
+    def stream_patterns(self, query: str, k: int = 5) -> Iterator[str]:
+        """Stream pattern analysis as it is generated"""
+        return self.analyzer.stream_patterns(query, k)
+    
+    async def analyze_combined(self, query: str, k: int = 5) -> Dict[str, str]:
+        """Analyze root cause and patterns concurrently"""
+        return await self.analyzer.analyze_both(query, k)
+    
+    async def analyze_many(self, queries: List[str], k: int = 5) -> List[Dict[str, str]]:
+        """Run combined analysis for several queries concurrently"""
+        return await self.analyzer.analyze_many(queries, k)
+    
     def search_incidents(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search incidents and return formatted results"""
         docs = self.analyzer.search_incidents(query, k)
@@ -55,6 +89,10 @@ class IncidentService:
         
         return results
     
+    def warm_up(self) -> None:
+        """Load the embedding model and vector index ahead of the first request"""
+        self.analyzer.warm_up()
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics"""
         return self.analyzer.get_stats()
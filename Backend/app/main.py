@@ -1,9 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from typing import List, Dict, Any
+from fastapi.responses import HTMLResponse, StreamingResponse
+from typing import List, Dict, Any, Iterator
+import json
 import uvicorn
+import asyncio
 import os
 import logging
 
@@ -17,7 +19,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-from .models import Incident, AnalysisRequest, AnalysisResponse
+from .models import (
+    Incident, AnalysisRequest, AnalysisResponse,
+    BatchAnalysisRequest, CombinedAnalysisResponse, BatchAnalysisResponse
+)
 from .incident_service import IncidentService
 
 app = FastAPI(title="ING Incident Analyzer API", version="1.0.0")
@@ -36,6 +41,15 @@ incident_service = IncidentService()
 
 app = FastAPI()
 
+@app.on_event("startup")
+async def warm_up():
+    """Pay model and index load costs before serving, not on the first request"""
+    try:
+        await asyncio.to_thread(incident_service.warm_up)
+        logger.info("Warm-up complete")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info(f"Incoming request: {request.method} {request.url}")
@@ -44,12 +58,23 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+def sse_events(chunks: Iterator[str]) -> Iterator[str]:
+    """Frame text chunks as server-sent events, ending with a done event"""
+    try:
+        for chunk in chunks:
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        logger.error(f"Streaming analysis failed: {e}")
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+
 @app.get("/")
 async def root():
     return {"message": "ING Incident Analyzer API"}
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint for load balancers and monitoring"""
     try:
         # Check if vector store is accessible
@@ -69,7 +94,7 @@ async def api_health():
     return {"status": "ok", "message": "API is running"}
 
 @app.post("/api/incidents", response_model=Dict[str, Any])
-async def add_incident(incident: Incident):
+def add_incident(incident: Incident):
     """Add a new incident to the knowledge base"""
     try:
         result = incident_service.add_incident(incident.dict())
@@ -78,7 +103,7 @@ async def add_incident(incident: Incident):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/incidents/batch", response_model=Dict[str, Any])
-async def add_incidents_batch(incidents: List[Incident]):
+def add_incidents_batch(incidents: List[Incident]):
     """Add multiple incidents"""
     try:
         result = incident_service.add_incidents_batch([inc.dict() for inc in incidents])
@@ -86,12 +111,21 @@ async def add_incidents_batch(incidents: List[Incident]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/incidents/bulk", response_model=Dict[str, Any])
+def add_incidents_bulk(incidents: List[Incident]):
+    """Add multiple incidents using batched vector store inserts"""
+    try:
+        result = incident_service.add_incidents_bulk([inc.dict() for inc in incidents])
+        return {"success": True, "processed_count": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/analyze/root-cause", response_model=AnalysisResponse)
 async def analyze_root_cause(request: AnalysisRequest):
     """Perform root cause analysis"""
     try:
         # print("yeah it")
-        result = incident_service.analyze_root_cause(request.query, request.k)
+        result = await incident_service.aanalyze_root_cause(request.query, request.k)
         return AnalysisResponse(result=result, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,13 +134,57 @@ async def analyze_root_cause(request: AnalysisRequest):
 async def analyze_patterns(request: AnalysisRequest):
     """Analyze patterns across incidents"""
     try:
-        result = incident_service.analyze_patterns(request.query, request.k)
+        result = await incident_service.aanalyze_patterns(request.query, request.k)
         return AnalysisResponse(result=result, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze/root-cause/stream")
+async def stream_root_cause(request: AnalysisRequest):
+    """Stream root cause analysis as server-sent events"""
+    chunks = incident_service.stream_root_cause(request.query, request.k)
+    return StreamingResponse(sse_events(chunks), media_type="text/event-stream")
+
+@app.post("/api/analyze/patterns/stream")
+async def stream_patterns(request: AnalysisRequest):
+    """Stream pattern analysis as server-sent events"""
+    chunks = incident_service.stream_patterns(request.query, request.k)
+    return StreamingResponse(sse_events(chunks), media_type="text/event-stream")
+
+@app.post("/api/analyze/combined", response_model=CombinedAnalysisResponse)
+async def analyze_combined(request: AnalysisRequest):
+    """Perform root cause and pattern analysis in one round trip"""
+    try:
+        result = await incident_service.analyze_combined(request.query, request.k)
+        return CombinedAnalysisResponse(success=True, **result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Perform combined analysis for several queries concurrently"""
+    try:
+        results = await incident_service.analyze_many(request.queries, request.k)
+        return BatchAnalysisResponse(
+            success=True,
+            results=[
+                CombinedAnalysisResponse(success=True, query=query, **result)
+                for query, result in zip(request.queries, results)
+            ]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/incidents", response_model=Dict[str, Any])
+def get_incidents():
+    """Get all stored incidents"""
+    try:
+        return {"success": True, "results": incident_service.get_incidents()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/incidents/stats", response_model=Dict[str, Any])
-async def get_stats():
+def get_stats():
     """Get collection statistics"""
     try:
         stats = incident_service.get_stats()
@@ -115,7 +193,7 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search", response_model=Dict[str, Any])
-async def search_incidents(query: str, k: int = 5):
+def search_incidents(query: str, k: int = 5):
     """Search for similar incidents"""
     try:
         results = incident_service.search_incidents(query, k)
@@ -19,11 +19,25 @@ class AnalysisRequest(BaseModel):
     query: str
     k: int = 5
 
+class BatchAnalysisRequest(BaseModel):
+    queries: List[str]
+    k: int = 5
+
 class AnalysisResponse(BaseModel):
     success: bool
     result: str
     metadata: Optional[Dict[str, Any]] = None
 
+class CombinedAnalysisResponse(BaseModel):
+    success: bool
+    root_cause: str
+    patterns: str
+    query: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    success: bool
+    results: List[CombinedAnalysisResponse]
+
 class StatsResponse(BaseModel):
     total_incidents: int
     total_chunks: int
@@ -1,15 +1,24 @@
 import os
+import asyncio
+import hashlib
 import logging
 import re
-from typing import List, Dict, Any, Tuple
-
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from threading import RLock
+from typing import List, Dict, Any, Callable, Hashable, Iterator, Optional, Set, Tuple
+
+import numpy as np
+import simsimd
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from google import genai
 
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
 from chromadb import HttpClient
+from chromadb.api import ClientAPI
 
 from .embeddings import TransformersEmbedding
 
@@ -18,11 +27,37 @@ from .embeddings import TransformersEmbedding
 # CONFIG
 # =====================
 DEFAULT_CHROMA_DB_PATH = "/app/chroma_data"
+# Inner-product space needs unit-length vectors; the previous L2 collection
+# cannot switch space in place, so its chunks are migrated on startup
+COLLECTION_NAME = "incidents-ip"
+LEGACY_COLLECTION_NAME = "incidents-new"
+MIGRATION_MARKER_KEY = "migrated_to"  # set on the legacy collection once fully copied
+EMBEDDING_MODEL = "thenlper/gte-small"
+DEFAULT_CHROMA_HOST = "localhost"
+DEFAULT_CHROMA_PORT = 8000
 GEMINI_MODEL = "gemini-2.5-flash"
-SIMILARITY_THRESHOLD = 0.5
+SIMILARITY_THRESHOLD = 0.5  # Chroma "ip" distance, i.e. 1 - cosine similarity
+RERANK_CANDIDATES = 50  # upper bound on the MMR pool; each candidate ships its vector
+RERANK_POOL_FACTOR = 4  # candidates fetched per requested hit
+MMR_LAMBDA = 0.7  # 1.0 ranks purely by relevance, lower values favour diverse hits
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+INGEST_BATCH_SIZE = 200
+EMBED_BATCH_SIZE = 64
 TEMPERATURE = 0.2
+MAX_CONTEXT_CHARS = 6000
+MAX_FIELD_CHARS = 500
+GEMINI_MAX_CONCURRENCY = 8
+LLM_CACHE_SIZE = 512
+LLM_CACHE_TTL_SECONDS = 600
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL_SECONDS = 300
+DOC_COUNT_REFRESH_SECONDS = 60
+
+# One "KEY: value" field per line of an ingested incident document, as if the
+# line were strip()ped first: keys start with a non-space, values must contain
+# a non-space and lose surrounding whitespace (including \r)
+_INCIDENT_RE = re.compile(r"^\s*([A-Z_][A-Z _]*): (.*?\S)\s*$", re.M)
 
 load_dotenv()
 
@@ -32,30 +67,163 @@ logger = logging.getLogger(__name__)
 G_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 
+# =====================
+# SHARED RESOURCES
+# =====================
+# Loading the transformer takes seconds and hundreds of MB, and each Chroma
+# client holds its own connection pool, so every analyzer in the process shares one
+@lru_cache(maxsize=1)
+def get_embeddings() -> TransformersEmbedding:
+    return TransformersEmbedding(EMBEDDING_MODEL)
+
+
+@lru_cache(maxsize=1)
+def get_chroma_client() -> ClientAPI:
+    return HttpClient(
+        host=os.getenv("CHROMA_HOST", DEFAULT_CHROMA_HOST),
+        port=int(os.getenv("CHROMA_PORT", DEFAULT_CHROMA_PORT))
+    )
+
+
+# =====================
+# QUERY CACHE
+# =====================
+class QueryCache:
+    def __init__(self, ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS, max_size: int = SEARCH_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
 # =====================
 # LLM WRAPPER
 # =====================
 class GeminiLLM:
-    def invoke(self, prompt: str) -> str:
+    def __init__(self):
+        self._cache = TTLCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL_SECONDS)
+        self._lock = RLock()
+        self._generation = 0
+        # Caps in-flight async Gemini calls across all concurrent requests so
+        # the process fills network wait time without blowing the QPM quota
+        self._semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+    def invalidate(self) -> None:
+        # Bumping the generation orphans every cached answer, which would
+        # otherwise have been built from stale retrieval context
+        with self._lock:
+            self._generation += 1
+
+    def _cache_key(self, prompt: str) -> bytes:
+        key = hashlib.blake2b(prompt.encode(), digest_size=16)
+        key.update(self._generation.to_bytes(8, "little"))
+        return key.digest()
+
+    def _cached(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def _store(self, key: bytes, text: str) -> None:
+        with self._lock:
+            self._cache[key] = text
+
+    @staticmethod
+    def _request(prompt: str) -> Dict[str, Any]:
         if not prompt or not prompt.strip():
             raise ValueError("Empty prompt passed to Gemini")
 
-        response = G_client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=[
+        return {
+            "model": GEMINI_MODEL,
+            "contents": [
                 {
                     "role": "user",
                     "parts": [{"text": prompt}]
                 }
             ],
-            config={
+            "config": {
                 "temperature": TEMPERATURE,
                 "max_output_tokens": 2048
             }
-        )
+        }
 
+    def invoke(self, prompt: str) -> str:
+        request = self._request(prompt)
+        key = self._cache_key(prompt)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        response = G_client.models.generate_content(**request)
+        self._store(key, response.text)
         return response.text
 
+    async def ainvoke(self, prompt: str) -> str:
+        request = self._request(prompt)
+        key = self._cache_key(prompt)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        async with self._semaphore:
+            response = await G_client.aio.models.generate_content(**request)
+        self._store(key, response.text)
+        return response.text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        request = self._request(prompt)
+        key = self._cache_key(prompt)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts: List[str] = []
+        for chunk in G_client.models.generate_content_stream(**request):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+
+        # Only a fully consumed, non-empty stream is a complete answer worth
+        # caching; a blocked or empty completion must not be served as one
+        if parts:
+            self._store(key, "".join(parts))
+
 
 # =====================
 # PROMPTS (STRONG + SAFE)
@@ -161,24 +329,138 @@ class IncidentAnalyzer:
             chunk_overlap=CHUNK_OVERLAP
         )
 
-        self.embeddings = TransformersEmbedding("thenlper/gte-small")
+        self.embeddings = get_embeddings()
 
-        self.vectorstore = Chroma(
-            collection_name="incidents-new",
-            client=HttpClient(host="localhost", port=8000),
-            embedding_function=self.embeddings
+        # Vectors are always computed here and passed explicitly, so the
+        # collection carries no embedding function of its own
+        self.collection = get_chroma_client().get_or_create_collection(
+            name=COLLECTION_NAME,
+            embedding_function=None,
+            metadata={"hnsw:space": "ip"}
         )
 
         self.llm = GeminiLLM()
 
+        self._search_cache = QueryCache()
+        self._ingest_generation = 0
+
+        self._count_lock = RLock()
+        self._doc_count = 0
+        self._doc_count_refreshed = float("-inf")
+        self._migrate_legacy_collection()
+        self._refresh_doc_count()
+
+    def _migrate_legacy_collection(self) -> None:
+        # Copy of chunks stored before vectors were normalized. Upserts keep the
+        # chunk ids, so an interrupted pass is simply repeated on the next start
+        # until a clean pass marks the legacy collection as migrated
+        try:
+            legacy = get_chroma_client().get_collection(LEGACY_COLLECTION_NAME, embedding_function=None)
+            if (legacy.metadata or {}).get(MIGRATION_MARKER_KEY) == COLLECTION_NAME:
+                return
+            total = legacy.count()
+        except Exception:
+            # Fresh install without the legacy collection, or Chroma is down
+            return
+
+        logger.warning(
+            f"Migrating {total} chunks from '{LEGACY_COLLECTION_NAME}' to '{COLLECTION_NAME}' "
+            "(re-embedding with normalized vectors); the API, including /health, "
+            "is unavailable until this finishes"
+        )
+
+        migrated = 0
+        failed: Set[str] = set()
+        for offset in range(0, total, INGEST_BATCH_SIZE):
+            try:
+                batch = legacy.get(include=["documents", "metadatas"], limit=INGEST_BATCH_SIZE, offset=offset)
+                rows = [
+                    (chunk_id, text, metadata or {})
+                    for chunk_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"])
+                    if text
+                ]
+                if not rows:
+                    continue
+
+                ids = [row[0] for row in rows]
+                batch_failed = self._write_chunks(ids, [row[1] for row in rows], [row[2] for row in rows], ids)
+            except Exception as e:
+                logger.error(f"Migration batch at offset {offset} failed: {e}")
+                failed.add(f"offset {offset}")
+                continue
+
+            failed |= batch_failed
+            migrated += len(ids) - len(batch_failed)
+            logger.info(f"Migrated {migrated}/{total} chunks from '{LEGACY_COLLECTION_NAME}'")
+
+        if failed:
+            logger.error(
+                f"Migrated {migrated}/{total} chunks from '{LEGACY_COLLECTION_NAME}'; the rest failed "
+                "and the migration will be retried on the next start"
+            )
+            return
+
+        try:
+            # Chroma rejects hnsw:* keys on modify, and the distance space is fixed anyway
+            metadata = {
+                key: value for key, value in (legacy.metadata or {}).items()
+                if not key.startswith("hnsw:")
+            }
+            metadata[MIGRATION_MARKER_KEY] = COLLECTION_NAME
+            legacy.modify(metadata=metadata)
+        except Exception as e:
+            logger.error(f"Could not mark '{LEGACY_COLLECTION_NAME}' as migrated, will re-run next start: {e}")
+            return
+
+        logger.warning(f"Migrated {migrated} chunks from '{LEGACY_COLLECTION_NAME}'")
+
+    def _refresh_doc_count(self) -> None:
+        try:
+            count = self.collection.count()
+        except Exception as e:
+            logger.error(f"Document count refresh failed: {e}")
+            return
+
+        with self._count_lock:
+            self._doc_count = count
+            self._doc_count_refreshed = time.monotonic()
+
+    def _invalidate_caches(self) -> None:
+        self._ingest_generation += 1
+        self._search_cache.clear()
+        self.llm.invalidate()
+
+    @staticmethod
+    def _truncate(text: str, limit: int) -> str:
+        return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
     def _format_docs(self, docs: List[Document]) -> str:
         if not docs:
             return "No similar historical incidents found."
-        return "\n\n".join(doc.page_content for doc in docs)
 
-    def ingest_incident(self, incident: Dict[str, Any]) -> bool:
-        try:
-            content = f"""
+        # Keep the prompt bounded: drop indentation and blank lines, clip
+        # overlong fields, and stop adding incidents once the budget is spent
+        parts: List[str] = []
+        used = 0
+        for doc in docs:
+            lines = (line.strip() for line in doc.page_content.splitlines())
+            text = "\n".join(self._truncate(line, MAX_FIELD_CHARS) for line in lines if line)
+            if not text:
+                continue
+
+            remaining = MAX_CONTEXT_CHARS - used
+            if len(text) > remaining:
+                if parts:
+                    break
+                text = self._truncate(text, remaining)
+
+            parts.append(text)
+            used += len(text) + 2
+
+        return "\n\n".join(parts) if parts else "No similar historical incidents found."
+
+    def _build_docs(self, incident: Dict[str, Any]) -> List[Document]:
+        content = f"""
         INCIDENT ID: {incident.get('incident_id')}
         TIMESTAMP: {incident.get('timestamp')}
         CATEGORY: {incident.get('category')}
@@ -190,92 +472,247 @@ class IncidentAnalyzer:
         RESOLUTION TIME MINS: {incident.get('resolution_time_mins')}
         """
 
-            chunks = self.text_splitter.split_text(content)
-
-            docs = [
-                Document(
-                    page_content=chunk,
-                    metadata={
-                        "incident_id": incident.get("incident_id"),
-                        "severity": incident.get("severity"),
-                        "category": incident.get("category"),
-                    }
-                )
-                for chunk in chunks
-            ]
-
-            if docs:
-                self.vectorstore.add_documents(docs)
-                return True
+        # Structured incidents almost always fit one chunk; only run the
+        # recursive splitter (and its overlap) for genuinely long records
+        content = content.strip()
+        chunks = [content] if len(content) <= CHUNK_SIZE else self.text_splitter.split_text(content)
+
+        return [
+            Document(
+                page_content=chunk,
+                metadata={
+                    "incident_id": incident.get("incident_id"),
+                    "severity": incident.get("severity"),
+                    "category": incident.get("category"),
+                }
+            )
+            for chunk in chunks
+        ]
 
-            return False
+    def ingest_incident(self, incident: Dict[str, Any]) -> bool:
+        return self.ingest_incidents_bulk([incident]) == 1
+
+    def ingest_incidents_bulk(self, incidents: List[Dict[str, Any]]) -> int:
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        ids: List[str] = []
+        owners: List[str] = []
+
+        # Chunk IDs derive from the incident ID, so a repeated incident in the
+        # same batch would collide; the last occurrence wins
+        unique_incidents = {incident.get("incident_id"): incident for incident in incidents}
+
+        for incident in unique_incidents.values():
+            incident_id = str(incident.get("incident_id"))
+            try:
+                docs = self._build_docs(incident)
+            except Exception as e:
+                logger.error(f"Failed to build documents for {incident_id}: {e}")
+                continue
+
+            for chunk_idx, doc in enumerate(docs):
+                texts.append(doc.page_content)
+                metadatas.append(doc.metadata)
+                ids.append(f"{incident_id}-{chunk_idx}")
+                owners.append(incident_id)
+
+        if not texts:
+            return 0
 
+        try:
+            failed = self._write_chunks(ids, texts, metadatas, owners)
         except Exception as e:
             logger.error(f"Ingest failed: {e}")
-            return False
+            return 0
+
+        # An incident only counts once every one of its chunks was written
+        return len(set(owners) - failed)
+
+    def _write_chunks(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        owners: List[str]
+    ) -> Set[str]:
+        # One batched forward pass for every chunk, then hand the vectors
+        # straight to the collection so Chroma never re-embeds
+        vectors = self.embeddings.embed_documents(texts, batch_size=EMBED_BATCH_SIZE)
+
+        failed: Set[str] = set()
+        try:
+            for i in range(0, len(texts), INGEST_BATCH_SIZE):
+                batch_ids = ids[i:i + INGEST_BATCH_SIZE]
+                try:
+                    self.collection.upsert(
+                        ids=batch_ids,
+                        embeddings=vectors[i:i + INGEST_BATCH_SIZE],
+                        documents=texts[i:i + INGEST_BATCH_SIZE],
+                        metadatas=metadatas[i:i + INGEST_BATCH_SIZE]
+                    )
+                except Exception as e:
+                    batch_owners = set(owners[i:i + INGEST_BATCH_SIZE])
+                    failed |= batch_owners
+                    logger.error(f"Ingest batch failed for {sorted(batch_owners)}: {e}")
+                    continue
+
+                # Re-ingested ids overcount until the next server refresh
+                with self._count_lock:
+                    self._doc_count += len(batch_ids)
+        finally:
+            self._invalidate_caches()
+
+        return failed
 
     def search_incidents(self, query: str, k: int = 5) -> List[Document]:
+        key = (query, k, self._ingest_generation)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            results: List[Tuple[Document, float]] = (
-                self.vectorstore.similarity_search_with_score(query, k)
+            res = self.collection.query(
+                query_embeddings=[self.embeddings.embed_query(query)],
+                n_results=max(k, min(RERANK_CANDIDATES, RERANK_POOL_FACTOR * k)),
+                include=["documents", "metadatas", "distances", "embeddings"]
             )
 
-            if not results:
+            distances = res["distances"][0]
+            if not distances:
                 return []
 
-            filtered = [doc for doc, score in results if score < SIMILARITY_THRESHOLD]
-            return filtered if filtered else [doc for doc, _ in results]
+            candidates = [i for i, distance in enumerate(distances) if distance < SIMILARITY_THRESHOLD]
+            if not candidates:
+                candidates = list(range(len(distances)))
+
+            # Only materialize Documents for the hits we actually return
+            keep = self._rerank(candidates, distances, res["embeddings"][0], k)
+            docs = [
+                Document(page_content=res["documents"][0][i], metadata=res["metadatas"][0][i] or {})
+                for i in keep
+            ]
+            self._search_cache.set(key, docs)
+            return docs
 
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
 
-    def analyze_root_cause(self, query: str, k: int = 5) -> str:
-        logger.info("Analyzing root cause for query: %s", query)
+    def _rerank(
+        self,
+        candidates: List[int],
+        distances: List[float],
+        embeddings: List[List[float]],
+        k: int
+    ) -> List[int]:
+        # Maximal marginal relevance: pick k candidates, trading relevance
+        # against similarity to the chunks already picked
+        if len(candidates) <= k:
+            return candidates
+
+        # Relevance comes from Chroma's distances; pairwise chunk similarity
+        # is the part Chroma cannot give us, computed on the returned vectors
+        relevance = 1.0 - np.asarray([distances[i] for i in candidates])
+        doc_vecs = np.asarray(embeddings, dtype=np.float32)[candidates]
+        similarity = 1.0 - np.asarray(simsimd.cdist(doc_vecs, doc_vecs, metric="cosine"))
+
+        selected = [int(np.argmax(relevance))]
+        while len(selected) < k:
+            redundancy = similarity[:, selected].max(axis=1)
+            scores = MMR_LAMBDA * relevance - (1.0 - MMR_LAMBDA) * redundancy
+            scores[selected] = -np.inf
+            selected.append(int(np.argmax(scores)))
+
+        return [candidates[i] for i in selected]
+
+    def _log_prompt(self, prompt: str) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Prompt length: %d", len(prompt))
+            logger.debug("Prompt preview:\n%s", prompt[:1000])
 
+    def _build_prompt(self, template: Callable[[str, str], str], query: str, k: int) -> str:
         docs = self.search_incidents(query, k)
         context = self._format_docs(docs)
-        print(f"Context for root cause analysis:\n{context} ,this is query {query}")
-
-        prompt = PromptTemplates.root_cause(context, query)
 
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("Prompt length: %d", len(prompt))
-            logger.debug("Prompt preview:\n%s", prompt[:1000])
+        prompt = template(context, query)
+        self._log_prompt(prompt)
+        return prompt
 
-        return self.llm.invoke(prompt)
+    def analyze_root_cause(self, query: str, k: int = 5) -> str:
+        logger.info("Analyzing root cause for query: %s", query)
+        return self.llm.invoke(self._build_prompt(PromptTemplates.root_cause, query, k))
 
     def analyze_patterns(self, query: str, k: int = 5) -> str:
         logger.info("Analyzing patterns for query: %s", query)
+        return self.llm.invoke(self._build_prompt(PromptTemplates.pattern, query, k))
 
-        docs = self.search_incidents(query, k)
+    def stream_root_cause(self, query: str, k: int = 5) -> Iterator[str]:
+        logger.info("Streaming root cause for query: %s", query)
+        yield from self.llm.stream(self._build_prompt(PromptTemplates.root_cause, query, k))
+
+    def stream_patterns(self, query: str, k: int = 5) -> Iterator[str]:
+        logger.info("Streaming patterns for query: %s", query)
+        yield from self.llm.stream(self._build_prompt(PromptTemplates.pattern, query, k))
+
+    async def aanalyze_root_cause(self, query: str, k: int = 5) -> str:
+        logger.info("Analyzing root cause for query: %s", query)
+        prompt = await asyncio.to_thread(self._build_prompt, PromptTemplates.root_cause, query, k)
+        return await self.llm.ainvoke(prompt)
+
+    async def aanalyze_patterns(self, query: str, k: int = 5) -> str:
+        logger.info("Analyzing patterns for query: %s", query)
+        prompt = await asyncio.to_thread(self._build_prompt, PromptTemplates.pattern, query, k)
+        return await self.llm.ainvoke(prompt)
+
+    async def analyze_both(self, query: str, k: int = 5) -> Dict[str, str]:
+        logger.info("Analyzing root cause and patterns for query: %s", query)
+
+        # Both prompts share the same retrieval, so search once and issue the
+        # two Gemini calls concurrently
+        docs = await asyncio.to_thread(self.search_incidents, query, k)
         context = self._format_docs(docs)
 
-        prompt = PromptTemplates.pattern(context, query)
+        root_cause_prompt = PromptTemplates.root_cause(context, query)
+        pattern_prompt = PromptTemplates.pattern(context, query)
+        self._log_prompt(root_cause_prompt)
+        self._log_prompt(pattern_prompt)
 
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("Prompt length: %d", len(prompt))
-            logger.debug("Prompt preview:\n%s", prompt[:1000])
+        root_cause, patterns = await asyncio.gather(
+            self.llm.ainvoke(root_cause_prompt),
+            self.llm.ainvoke(pattern_prompt)
+        )
+        return {"root_cause": root_cause, "patterns": patterns}
 
-        return self.llm.invoke(prompt)
+    async def analyze_many(self, queries: List[str], k: int = 5) -> List[Dict[str, str]]:
+        # GeminiLLM bounds the in-flight calls, so every query can be started at once
+        return await asyncio.gather(*(self.analyze_both(query, k) for query in queries))
+
+    def warm_up(self) -> None:
+        # Run one embedding and one ANN query so the model weights and the
+        # HNSW index are resident before the first user request. This goes
+        # straight to the collection so the search cache holds no dummy entry
+        vec = self.embeddings.embed_query("warmup")
+        self.collection.query(query_embeddings=[vec], n_results=1, include=["distances"])
 
     def get_stats(self) -> Dict[str, Any]:
-        try:
-            return {"total_documents": self.vectorstore._collection.count()}
-        except Exception:
-            return {"total_documents": 0}
+        # Serve the in-process count and only go back to Chroma once it is stale
+        if time.monotonic() - self._doc_count_refreshed > DOC_COUNT_REFRESH_SECONDS:
+            self._refresh_doc_count()
+
+        with self._count_lock:
+            total_documents = self._doc_count
+
+        return {
+            "total_documents": total_documents,
+            "search_cache": self._search_cache.stats()
+        }
 
     def parse_incident_string(self, doc: str) -> Dict[str, str]:
-        incident = {}
-        for line in doc.split("\n"):
-            m = re.match(r"(?P<k>[A-Z _]+): (?P<v>.+)", line.strip())
-            if m:
-                incident[m.group("k").lower().replace(" ", "_")] = m.group("v")
-        return incident
+        return {k.lower().replace(" ", "_"): v for k, v in _INCIDENT_RE.findall(doc)}
 
     def get_incidents(self) -> List[Dict[str, str]]:
         try:
-            docs = self.vectorstore.get()["documents"]
+            docs = self.collection.get(include=["documents"])["documents"]
             return [self.parse_incident_string(d) for d in docs]
         except Exception:
             return []
@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -7,11 +8,23 @@ from datetime import datetime, timedelta
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 st.set_page_config(page_title="AI Incident Analyzer", layout="wide", page_icon="🔍")
 
+@st.cache_resource
+def _get_session():
+    """Keep-alive connection pool shared by all backend calls; cached so it survives reruns"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_SESSION = _get_session()
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -60,7 +73,7 @@ def check_api_health():
     
     for attempt in range(max_retries):
         try:
-            response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+            response = _SESSION.get(f"{API_BASE_URL}/health", timeout=5)
             if response.status_code == 200:
                 return True
         except:
@@ -74,10 +87,10 @@ def call_api(endpoint: str, method: str = "GET", data: dict = None, timeout: int
     
     try:
         if method == "GET":
-            response = requests.get(url, timeout=timeout)
+            response = _SESSION.get(url, timeout=timeout)
         elif method == "POST":
             headers = {'Content-Type': 'application/json'}
-            response = requests.post(url, json=data, headers=headers, timeout=timeout)
+            response = _SESSION.post(url, json=data, headers=headers, timeout=timeout)
         else:
             return None
         
@@ -97,9 +110,47 @@ def call_api(endpoint: str, method: str = "GET", data: dict = None, timeout: int
         st.error(f"❌ Unexpected error: {str(e)}")
         return None
 
-def show_api_status():
+STREAMING_ENDPOINTS = {
+    "Root Cause Analysis": "/api/analyze/root-cause/stream",
+    "Pattern Analysis": "/api/analyze/patterns/stream",
+}
+
+def stream_api(endpoint: str, data: dict, state: dict, timeout: int = 120):
+    """Yield text chunks from a server-sent events endpoint; sets state['ok'] once the stream completes"""
+    url = f"{API_BASE_URL}{endpoint}"
+    
+    try:
+        with _SESSION.post(url, json=data, stream=True, timeout=(5, timeout)) as response:
+            if response.status_code != 200:
+                st.error(f"API Error {response.status_code}: {response.text}")
+                return
+            
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    payload = json.loads(line[len("data: "):])
+                    if event == "done":
+                        state["ok"] = True
+                        return
+                    if event == "error":
+                        st.error(f"❌ Analysis error: {payload}")
+                        return
+                    yield payload
+                elif not line:
+                    event = "message"
+    
+    except requests.ConnectionError:
+        st.error("🚫 Cannot connect to the API server. Please make sure the backend is running.")
+    except requests.Timeout:
+        st.error("⏰ API request timed out. The server might be busy or not responding.")
+    except Exception as e:
+        st.error(f"❌ Unexpected error: {str(e)}")
+
+def show_api_status(api_healthy: bool):
     """Show API connection status"""
-    if check_api_health():
+    if api_healthy:
         st.sidebar.success("✅ API Connected")
         return True
     else:
@@ -107,16 +158,22 @@ def show_api_status():
         st.sidebar.info("Please start the backend server: `uvicorn app.main:app --reload`")
         return False
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_incidents_cached():
+    # Raises on failure: Streamlit does not cache exceptions, so an outage
+    # is retried on the next rerun instead of pinning an empty list for 30s
+    response = _SESSION.get(f"{API_BASE_URL}/api/incidents", timeout=10)
+    response.raise_for_status()
+    return response.json().get('results', [])
+
 def fetch_incidents():
     """Fetch incidents from backend API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/incidents", timeout=10)
-        if response.status_code == 200:
-            return response.json().get('results', [])
-        return []
-    except:
+        return _fetch_incidents_cached()
+    except (requests.RequestException, ValueError):
         return []
 
+@st.cache_resource
 def create_sample_data():
     """Create sample data for demonstration"""
     return [
@@ -131,18 +188,53 @@ def create_sample_data():
         for i in range(50)
     ]
 
-# Visualization Functions
-def create_metrics_row(incidents):
-    """Create metrics overview row"""
-    if not incidents:
-        incidents = create_sample_data()
+def load_dashboard_data():
+    """Run the health probe alongside the incidents fetch instead of one after the other"""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        health = pool.submit(check_api_health)
+        incidents = fetch_incidents()
+        return health.result(), incidents
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SEVERITY_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+@st.cache_data(ttl=60)
+def _to_df(incidents_json: str) -> pd.DataFrame:
+    """Build the incidents DataFrame once, with the derived time columns every chart needs"""
+    df = pd.DataFrame(json.loads(incidents_json))
+    
+    if 'timestamp' in df.columns:
+        # Backend timestamps mix ISO forms (microseconds, "Z" suffix, naive);
+        # unparseable ones become NaT and simply drop out of the time charts
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce', utc=True)
+        # datetime64 / int keys keep groupbys in vectorized code instead of
+        # hashing Python date and string objects; nullable ints survive NaT rows
+        df['date'] = df['timestamp'].dt.floor('D')
+        df['hour'] = df['timestamp'].dt.hour.astype('Int64')
+        df['day_of_week'] = df['timestamp'].dt.dayofweek.astype('Int64')  # 0 = Monday
+        df['week'] = df['timestamp'].dt.isocalendar().week
+        df['year'] = df['timestamp'].dt.year.astype('Int64')
+    
+    if 'resolution_time_mins' in df.columns:
+        df['resolution_time_mins'] = pd.to_numeric(df['resolution_time_mins'], errors='coerce')
     
-    df = pd.DataFrame(incidents)
+    if 'severity' in df.columns:
+        # Keep any non-standard severities from the backend rather than turning them into NaN
+        extra = sorted(set(df['severity'].dropna()) - set(SEVERITY_LEVELS))
+        df['severity'] = df['severity'].astype(pd.CategoricalDtype(SEVERITY_LEVELS + extra, ordered=True))
     
+    if 'category' in df.columns:
+        df['category'] = df['category'].astype('category')
+    
+    return df
+
+# Visualization Functions
+def create_metrics_row(df):
+    """Create metrics overview row"""
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Incidents", len(incidents))
+        st.metric("Total Incidents", len(df))
     
     with col2:
         if not df.empty and 'severity' in df.columns:
@@ -159,13 +251,8 @@ def create_metrics_row(incidents):
             unique_categories = df['category'].nunique()
             st.metric("Categories", unique_categories)
 
-def create_category_distribution(incidents):
+def create_category_distribution(df):
     """Create category distribution chart"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'category' not in df.columns:
         return
     
@@ -179,19 +266,12 @@ def create_category_distribution(incidents):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_severity_timeline(incidents):
+def create_severity_timeline(df):
     """Create severity timeline chart"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'timestamp' not in df.columns or 'severity' not in df.columns:
         return
     
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['date'] = df['timestamp'].dt.date
-    daily_counts = df.groupby(['date', 'severity']).size().reset_index(name='count')
+    daily_counts = df.groupby(['date', 'severity'], observed=True).size().reset_index(name='count')
     
     fig = px.line(daily_counts, x='date', y='count', color='severity',
                   title='Daily Incidents by Severity',
@@ -199,17 +279,12 @@ def create_severity_timeline(incidents):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_mttr_by_category(incidents):
+def create_mttr_by_category(df):
     """Create MTTR by category chart"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'category' not in df.columns or 'resolution_time_mins' not in df.columns:
         return
     
-    mttr_by_category = df.groupby('category')['resolution_time_mins'].mean().reset_index()
+    mttr_by_category = df.groupby('category', observed=True)['resolution_time_mins'].mean().reset_index()
     mttr_by_category.columns = ['Category', 'MTTR_Minutes']
     
     fig = px.bar(mttr_by_category, x='Category', y='MTTR_Minutes',
@@ -219,21 +294,14 @@ def create_mttr_by_category(incidents):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_trend_analysis(incidents):
+def create_trend_analysis(df):
     """Create trend analysis chart"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'timestamp' not in df.columns:
         return
     
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['week'] = df['timestamp'].dt.isocalendar().week
-    df['year'] = df['timestamp'].dt.year
     weekly_trends = df.groupby(['year', 'week']).size().reset_index(name='count')
-    weekly_trends['date'] = weekly_trends.apply(lambda x: f"{x['year']}-W{x['week']}", axis=1)
+    weekly_trends['date'] = (weekly_trends['year'].astype(str) + '-W'
+                             + weekly_trends['week'].astype(str).str.zfill(2))
     
     fig = px.line(weekly_trends, x='date', y='count', 
                   title='Weekly Incident Trends',
@@ -242,42 +310,28 @@ def create_trend_analysis(incidents):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_heatmap(incidents):
+def create_heatmap(df):
     """Create incident heatmap by day of week and hour"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'timestamp' not in df.columns:
         return
     
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.day_name()
-    df['day_of_week'] = pd.Categorical(df['day_of_week'], 
-                                      categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
-                                      ordered=True)
-    
     heatmap_data = df.groupby(['day_of_week', 'hour']).size().reset_index(name='count')
+    heatmap_data['day_of_week'] = heatmap_data['day_of_week'].map(dict(enumerate(DAYS_OF_WEEK)))
     
     fig = px.density_heatmap(heatmap_data, x='hour', y='day_of_week', z='count',
                             title='Incident Heatmap by Day and Hour',
+                            category_orders={'day_of_week': DAYS_OF_WEEK},
                             labels={'hour': 'Hour of Day', 'day_of_week': 'Day of Week', 'count': 'Incidents'})
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_severity_distribution(incidents):
+def create_severity_distribution(df):
     """Create severity distribution chart"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty or 'severity' not in df.columns:
         return
     
-    severity_counts = df['severity'].value_counts().reset_index()
+    severity_counts = df['severity'].value_counts()
+    severity_counts = severity_counts[severity_counts > 0].reset_index()
     severity_counts.columns = ['Severity', 'Count']
     
     # Define severity order and colors
@@ -291,22 +345,16 @@ def create_severity_distribution(incidents):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def create_top_incidents_table(incidents):
+def create_top_incidents_table(df):
     """Create table of recent incidents"""
-    if not incidents:
-        incidents = create_sample_data()
-    
-    df = pd.DataFrame(incidents)
-    
     if df.empty:
         return
     
     # Select and format columns for display
     display_cols = ['incident_id', 'timestamp', 'category', 'severity']
     if all(col in df.columns for col in display_cols):
-        recent_incidents = df[display_cols].copy()
-        recent_incidents['timestamp'] = pd.to_datetime(recent_incidents['timestamp']).dt.strftime('%Y-%m-%d %H:%M')
-        recent_incidents = recent_incidents.sort_values('timestamp', ascending=False).head(10)
+        recent_incidents = df[display_cols].sort_values('timestamp', ascending=False).head(10).copy()
+        recent_incidents['timestamp'] = recent_incidents['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
         
         st.subheader("📋 Recent Incidents")
         st.dataframe(recent_incidents, use_container_width=True, hide_index=True)
@@ -315,8 +363,12 @@ def create_top_incidents_table(incidents):
 def main():
     st.markdown('<h1 class="main-header">🔍 AI Incident Analyzer Dashboard</h1>', unsafe_allow_html=True)
     
+    if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
+        _fetch_incidents_cached.clear()
+    
     # Check API connection
-    api_connected = show_api_status()
+    api_healthy, fetched_incidents = load_dashboard_data()
+    api_connected = show_api_status(api_healthy)
     
     if not api_connected:
         st.warning("""
@@ -348,28 +400,31 @@ def main():
         st.info("📊 Showing sample data in demo mode")
         incidents = create_sample_data()
     else:
-        # Fetch real data from API
-        incidents = fetch_incidents()
+        # Real data from API
+        incidents = fetched_incidents
         if not incidents:
             st.info("No incidents found. Showing sample data for demonstration.")
             incidents = create_sample_data()
 
+    # Build the DataFrame once per payload and share it across all charts
+    df = _to_df(json.dumps(incidents))
+
     # Navigation
     page = st.sidebar.radio("Navigation", ["Dashboard", "Incident Analysis", "Add Incidents", "Statistics"])
     
     if page == "Dashboard":
-        show_dashboard(incidents)
+        show_dashboard(df)
     elif page == "Incident Analysis":
         show_analysis_page()
     elif page == "Add Incidents":
         show_add_incidents_page()
     elif page == "Statistics":
-        show_statistics_page(incidents)
+        show_statistics_page(df)
 
-def show_dashboard(incidents):
+def show_dashboard(df):
     """Show main dashboard with graphs"""
     # Metrics row
-    create_metrics_row(incidents)
+    create_metrics_row(df)
     
     # Create tabs for different visualizations
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "📈 Trends", "🔥 Heatmap", "📋 Details"])
@@ -379,25 +434,25 @@ def show_dashboard(incidents):
         
         with col1:
             st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-            create_category_distribution(incidents)
+            create_category_distribution(df)
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-            create_mttr_by_category(incidents)
+            create_mttr_by_category(df)
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
             st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-            create_severity_distribution(incidents)
+            create_severity_distribution(df)
             st.markdown('</div>', unsafe_allow_html=True)
             
             st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-            create_severity_timeline(incidents)
+            create_severity_timeline(df)
             st.markdown('</div>', unsafe_allow_html=True)
     
     with tab2:
         st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-        create_trend_analysis(incidents)
+        create_trend_analysis(df)
         st.markdown('</div>', unsafe_allow_html=True)
         
         col1, col2 = st.columns(2)
@@ -415,7 +470,7 @@ def show_dashboard(incidents):
     
     with tab3:
         st.markdown('<div class="plot-container">', unsafe_allow_html=True)
-        create_heatmap(incidents)
+        create_heatmap(df)
         st.markdown('</div>', unsafe_allow_html=True)
         
         st.markdown("""
@@ -426,15 +481,14 @@ def show_dashboard(incidents):
         """)
     
     with tab4:
-        create_top_incidents_table(incidents)
+        create_top_incidents_table(df)
         
         # Additional details
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📈 Performance Metrics")
-            if incidents and len(incidents) > 0:
-                df = pd.DataFrame(incidents)
+            if not df.empty:
                 if 'resolution_time_mins' in df.columns:
                     avg_resolution = df['resolution_time_mins'].mean()
                     max_resolution = df['resolution_time_mins'].max()
@@ -461,7 +515,7 @@ def show_analysis_page():
     
     analysis_type = st.selectbox(
         "Analysis Type",
-        ["Root Cause Analysis", "Pattern Analysis", "General Search"]
+        ["Root Cause Analysis", "Pattern Analysis", "Root Cause + Patterns", "General Search"]
     )
     
     query = st.text_area(
@@ -473,14 +527,25 @@ def show_analysis_page():
     k = st.slider("Number of similar incidents to consider:", 1, 10, 5)
     
     if st.button("Run Analysis", type="primary"):
-        if query:
+        if not query:
+            st.warning("Please enter a query")
+        elif analysis_type in STREAMING_ENDPOINTS:
+            st.subheader("Analysis Results")
+            st.markdown("---")
+            
+            # Render tokens as Gemini produces them instead of waiting for the full answer
+            state = {"ok": False}
+            st.write_stream(stream_api(STREAMING_ENDPOINTS[analysis_type], {"query": query, "k": k}, state))
+            
+            if state["ok"]:
+                st.success("✅ Analysis completed successfully!")
+            else:
+                st.error("Analysis failed. Please check if the backend is running properly.")
+        else:
             with st.spinner("Analyzing..."):
-                if analysis_type == "Root Cause Analysis":
-                    result = call_api("/api/analyze/root-cause", "POST", 
-                                    {"query": query, "k": k})
-                elif analysis_type == "Pattern Analysis":
-                    result = call_api("/api/analyze/patterns", "POST", 
-                                    {"query": query, "k": k})
+                if analysis_type == "Root Cause + Patterns":
+                    result = call_api("/api/analyze/combined", "POST", 
+                                    {"query": query, "k": k}, timeout=60)
                 else:
                     result = call_api(f"/api/search?query={query}&k={k}")
             
@@ -496,13 +561,14 @@ def show_analysis_page():
                             st.write(f"**Severity**: {res['metadata'].get('severity', 'Unknown')}")
                             st.write(f"**Content**: {res['content']}")
                 else:
-                    st.markdown(result['result'])
+                    st.markdown("### Root Cause")
+                    st.markdown(result['root_cause'])
+                    st.markdown("### Patterns")
+                    st.markdown(result['patterns'])
                 
                 st.success("✅ Analysis completed successfully!")
             else:
                 st.error("Analysis failed. Please check if the backend is running properly.")
-        else:
-            st.warning("Please enter a query")
 
 def show_add_incidents_page():
     """Show add incidents page"""
@@ -538,6 +604,7 @@ def show_add_incidents_page():
                     
                     result = call_api("/api/incidents", "POST", incident_data)
                     if result and result.get('success'):
+                        _fetch_incidents_cached.clear()
                         st.success(f"✅ Incident {incident_id} added successfully!")
                     else:
                         st.error("❌ Failed to add incident")
@@ -555,8 +622,9 @@ def show_add_incidents_page():
                     incidents = [incidents]
                 
                 if st.button("Upload Incidents"):
-                    result = call_api("/api/incidents/batch", "POST", incidents)
+                    result = call_api("/api/incidents/bulk", "POST", incidents)
                     if result and result.get('success'):
+                        _fetch_incidents_cached.clear()
                         st.success(f"✅ Uploaded {result['processed_count']} incidents successfully!")
                     else:
                         st.error("❌ Upload failed")
@@ -564,11 +632,11 @@ def show_add_incidents_page():
             except json.JSONDecodeError:
                 st.error("Invalid JSON file")
 
-def show_statistics_page(incidents):
+def show_statistics_page(df):
     """Show statistics page"""
     st.header("Statistics")
     
-    if not incidents:
+    if df.empty:
         st.warning("No data available for statistics")
         return
     
@@ -577,11 +645,11 @@ def show_statistics_page(incidents):
     
     with col1:
         st.subheader("Overview")
-        df = pd.DataFrame(incidents)
-        st.metric("Total Incidents", len(incidents))
+        st.metric("Total Incidents", len(df))
         
         if 'severity' in df.columns:
             severity_counts = df['severity'].value_counts()
+            severity_counts = severity_counts[severity_counts > 0]
             st.write("**Severity Distribution:**")
             for severity, count in severity_counts.items():
                 st.write(f"- {severity}: {count}")
@@ -589,6 +657,7 @@ def show_statistics_page(incidents):
     with col2:
         st.subheader("Actions")
         if st.button("Refresh Statistics"):
+            _fetch_incidents_cached.clear()
             st.rerun()
         
         if st.button("Export Statistics"):
@@ -598,9 +667,6 @@ def show_statistics_page(incidents):
     st.subheader("Advanced Statistics")
     
     if 'timestamp' in df.columns and 'resolution_time_mins' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['week'] = df['timestamp'].dt.isocalendar().week
-        
         weekly_stats = df.groupby('week').agg({
             'resolution_time_mins': 'mean',
             'incident_id': 'count'